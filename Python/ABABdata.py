@@ -8,19 +8,29 @@ Created on Thu Aug 12 10:43:00 2021
 
 #Import packages
 import numpy as np
-import math
 import matplotlib.pyplot as plt
 
+#Import values precomputed for each design shape
+from cell_cache import trend_offsets, ABAB_layout
+
+#Import function to find phases in labels stored as strings or codes
+from precision import phase_indices
+
 #This function creates a time series with n points, an autocorrelation of a,
-#and a constant of ct
+#and a constant of ct. The random values are drawn from rng (e.g., a stream 
+#from series_rng in streams.py) or from the global numpy generator if omitted.
 
-def create_time_series(n, a, ct):
+def create_time_series(n, a, ct, rng = None):
+    
+    #Use global generator if no random stream is provided
+    if rng is None:
+        rng = np.random
     
     #Create an empty vector to hold values
     time_series = np.empty((0,))
     
     #Compute first point (no autocorrelation possible)
-    point1 = np.random.normal(size = 1)
+    point1 = rng.normal(size = 1)
 
     #Add point1 to time series
     time_series = np.hstack((time_series, point1))
@@ -29,7 +39,7 @@ def create_time_series(n, a, ct):
     for i in range(1, n):
         
         #Compute autocorrelated point
-        point = a*time_series[i-1]+np.random.normal(size = 1)
+        point = a*time_series[i-1]+rng.normal(size = 1)
         
         #Add autocorrelated point to time series
         time_series = np.hstack((time_series, point))
@@ -43,17 +53,18 @@ def create_time_series(n, a, ct):
 #This function creates data for an ABAB graph with an autocorrelation of a, a 
 #trend of tr (in degrees), a constant of ct, nb_pointsA1 and nbpointsA2 in the 
 #first and second Phase A, nb_pointsB1 and nb_pointsB2 in the first and second 
-#Phase B, and a standardized mean difference of smd 
+#Phase B, and a standardized mean difference of smd. The random values are 
+#drawn from rng (optional).
 
 def create_ABAB_data(a, tr, ct, nb_pointsA1, nb_pointsB1, nb_pointsA2, 
-                     nb_pointsB2, smd):
+                     nb_pointsB2, smd, rng = None):
     
     #Compute total number of points
     total_points = nb_pointsA1 + nb_pointsB1 + nb_pointsA2 + nb_pointsB2
     
     
     #Create time series
-    time_series = create_time_series(total_points, a, ct)
+    time_series = create_time_series(total_points, a, ct, rng)
     
     #Extract values for first Phase A
     PhaseA1 = time_series[0:nb_pointsA1].copy()
@@ -74,17 +85,8 @@ def create_ABAB_data(a, tr, ct, nb_pointsA1, nb_pointsB1, nb_pointsA2,
     all_values = np.hstack((PhaseA1, PhaseB1, PhaseA2, PhaseB2))
     
     
-    #Identify middle point around which to pivot trend
-    middle_point = np.median(range(len(all_values)))
-    
-    #Apply trend to all points
-    for i in range(len(all_values)):
-        
-        #Compute distance to middle point for each point
-        distance = i - middle_point
-        
-        #Add trend to each point using trigonometry (tangent of radians)
-        all_values[i] = all_values[i] + distance*math.tan(tr*math.pi/180)
+    #Add trend to all points (pivoting around middle point)
+    all_values += trend_offsets(len(all_values), tr)
     
     
     #Create labels
@@ -102,10 +104,10 @@ def create_ABAB_data(a, tr, ct, nb_pointsA1, nb_pointsB1, nb_pointsA2,
 def ABABgraph(ABAB_data):
     
     #Identify indices for Phases A and B
-    A1, = np.where(ABAB_data[0] == 'A1')
-    B1, = np.where(ABAB_data[0] == 'B1')
-    A2, = np.where(ABAB_data[0] == 'A2')
-    B2, = np.where(ABAB_data[0] == 'B2')
+    A1 = phase_indices(ABAB_data[0], 'A1')
+    B1 = phase_indices(ABAB_data[0], 'B1')
+    A2 = phase_indices(ABAB_data[0], 'A2')
+    B2 = phase_indices(ABAB_data[0], 'B2')
     
     #Extract values for Phases A and B
     valuesA1 = ABAB_data[1][A1]
@@ -113,34 +115,35 @@ def ABABgraph(ABAB_data):
     valuesA2 = ABAB_data[1][A2]
     valuesB2 = ABAB_data[1][B2]
     
+    #Layout of graph for number of points in each phase
+    x_values, phase_lines, label_positions = ABAB_layout(len(A1), len(B1), 
+                                                         len(A2), len(B2))
+    xA1, xB1, xA2, xB2 = x_values
+    
     #Initialize figure
     fig = plt.figure()
     ax = fig.add_subplot(111)
     
     #Plot data
-    plt.plot(A1+1, valuesA1, 'k', B1+1, valuesB1, 'k', A2+1, valuesA2, 'k', 
-             B2+1, valuesB2, 'k', marker = 's', clip_on=False)
+    plt.plot(xA1, valuesA1, 'k', xB1, valuesB1, 'k', xA2, valuesA2, 'k', 
+             xB2, valuesB2, 'k', marker = 's', clip_on=False)
     
     #Add phase change lines
-    plt.axvline(x=len(A1)+0.5, color = 'k', ls='dashed')
-    plt.axvline(x=len(A1)+len(B1)+0.5, color = 'k', ls='dashed')
-    plt.axvline(x=len(A1)+len(B1)+len(A2) + 0.5, color = 'k', ls='dashed')
+    for phase_line in phase_lines:
+        plt.axvline(x=phase_line, color = 'k', ls='dashed')
            
     #Add labels
     plt.xlabel('Measurement Times')
     plt.ylabel('Behavior')
     
     #Adjust height of graph
-    plt.ylim(0, np.max(ABAB_data[1]*1.2))
+    height = np.max(ABAB_data[1])*1.2
+    plt.ylim(0, height)
     
     #Add labels at the top of each Phase 
-    plt.text((len(A1)+1)/2, np.max(ABAB_data[1]*1.2), 'Phase A', ha = 'center')
-    plt.text((len(A1)*2+len(B1)+1)/2, np.max(ABAB_data[1]*1.2), 'Phase B', 
-             ha = 'center')
-    plt.text((len(A1)*2+len(B1)*2+len(A2)+1)/2, np.max(ABAB_data[1]*1.2), 
-             'Phase A', ha = 'center')
-    plt.text((len(A1)*2+len(B1)*2+len(A2)*2+len(B2)+1)/2, 
-                np.max(ABAB_data[1]*1.2), 'Phase B', ha = 'center')   
+    for position, phase in zip(label_positions, ['Phase A', 'Phase B', 
+                                                 'Phase A', 'Phase B']):
+        plt.text(position, height, phase, ha = 'center')
     
     #Remove labels for y axis 
     labels = [item.get_text() for item in ax.get_yticklabels()]
@@ -8,19 +8,29 @@ Created on Wed Aug 11 09:24:12 2021
 
 #Import packages
 import numpy as np
-import math
 import matplotlib.pyplot as plt
 
+#Import values precomputed for each design shape
+from cell_cache import trend_offsets
+
+#Import function to find phases in labels stored as strings or codes
+from precision import phase_indices
+
 #This function creates a time series with n points, an autocorrelation of a,
-#and a constant of ct
+#and a constant of ct. The random values are drawn from rng (e.g., a stream 
+#from series_rng in streams.py) or from the global numpy generator if omitted.
 
-def create_time_series(n, a, ct):
+def create_time_series(n, a, ct, rng = None):
+    
+    #Use global generator if no random stream is provided
+    if rng is None:
+        rng = np.random
     
     #Create an empty vector to hold values
     time_series = np.empty((0,))
     
     #Compute first point (no autocorrelation possible)
-    point1 = np.random.normal(size = 1)
+    point1 = rng.normal(size = 1)
 
     #Add point1 to time series
     time_series = np.hstack((time_series, point1))
@@ -29,7 +39,7 @@ def create_time_series(n, a, ct):
     for i in range(1, n):
         
         #Compute autocorrelated point
-        point = a*time_series[i-1]+np.random.normal(size = 1)
+        point = a*time_series[i-1]+rng.normal(size = 1)
         
         #Add autcorrelated point to time series
         time_series = np.hstack((time_series, point))
@@ -43,9 +53,14 @@ def create_time_series(n, a, ct):
 #This function creates data for an alternating treatment graph with an 
 #autocorrelation of a, a trend of tr (in degrees), a constant of ct, a minimum 
 #of nb_points in each condition, and a standardized mean difference of smd. The 
-#alternation scheme can be 'systematic', 'semi-random', or 'random' 
+#alternation scheme can be 'systematic', 'semi-random', or 'random'. The 
+#random values are drawn from rng (optional).
 
-def create_AT_data(a, tr, ct, nb_points, smd, alternation):
+def create_AT_data(a, tr, ct, nb_points, smd, alternation, rng = None):
+    
+    #Use global generator if no random stream is provided
+    if rng is None:
+        rng = np.random
     
     #If alternation is systematic (e.g., ABABABA)
     if alternation == 'systematic':
@@ -63,7 +78,7 @@ def create_AT_data(a, tr, ct, nb_points, smd, alternation):
         for i in range(nb_points):
             
             #Randomly select the order of two conditions
-            conditions = np.random.choice(['A', 'B'], 2, replace = False)
+            conditions = rng.choice(['A', 'B'], 2, replace = False)
         
             #Add conditions to labels 
             labels = np.hstack((labels, conditions))
@@ -78,13 +93,13 @@ def create_AT_data(a, tr, ct, nb_points, smd, alternation):
         while (np.sum(labels == 'A') < nb_points) | (np.sum(labels == 'B') < nb_points):
             
             #Randomly select one condition 
-            condition = np.random.choice(['A', 'B'], 1)
+            condition = rng.choice(['A', 'B'], 1)
             
             #Add condition to labels 
             labels = np.hstack((labels, condition))
         
     #Create times series
-    time_series = create_time_series(len(labels), a, ct)
+    time_series = create_time_series(len(labels), a, ct, rng)
     
     #Indices for Phase B
     idxB, = np.where(labels == 'B')
@@ -93,17 +108,8 @@ def create_AT_data(a, tr, ct, nb_points, smd, alternation):
     all_values = time_series.copy()
     all_values[idxB] = all_values[idxB] + smd
     
-    #Identify middle point around which to pivot trend
-    middle_point = np.median(range(len(all_values)))
-    
-    #Apply trend to all points
-    for i in range(len(all_values)):
-        
-        #Compute distance to middle point for each point
-        distance = i - middle_point
-        
-        #Add trend to each point using trigonometry (tangent of radians)
-        all_values[i] = all_values[i] + distance*math.tan(tr*math.pi/180)
+    #Add trend to all points (pivoting around middle point)
+    all_values += trend_offsets(len(all_values), tr)
     
     #Combine labels and values in same list
     AT_data = [labels, all_values]
@@ -116,8 +122,8 @@ def create_AT_data(a, tr, ct, nb_points, smd, alternation):
 def ATgraph(AT_data):
     
     #Identify indices for Phases A and B
-    A, = np.where(AT_data[0] == 'A')
-    B, = np.where(AT_data[0] == 'B')
+    A = phase_indices(AT_data[0], 'A')
+    B = phase_indices(AT_data[0], 'B')
     
     #Extract values for Phases A and B
     valuesA = AT_data[1][A]
@@ -151,5 +157,5 @@ def ATgraph(AT_data):
     ax.spines['top'].set_visible(False)
 
 #To test function, remove the hashtags from the two lines below
-AT_data = create_AT_data(0.1, 30, 10, 5, 10, 'semi-random')
-ATgraph(AT_data)
\ No newline at end of file
+#AT_data = create_AT_data(0.1, 30, 10, 5, 10, 'semi-random')
+#ATgraph(AT_data)
\ No newline at end of file
@@ -8,19 +8,29 @@ Created on Thu Aug 12 10:43:00 2021
 
 #Import packages
 import numpy as np
-import math
 import matplotlib.pyplot as plt
 
+#Import values precomputed for each design shape
+from cell_cache import trend_offsets
+
+#Import function to convert labels stored as codes to strings
+from precision import phase_labels
+
 #This function creates a time series with n points, an autocorrelation of a,
-#and a constant of ct
+#and a constant of ct. The random values are drawn from rng (e.g., a stream 
+#from series_rng in streams.py) or from the global numpy generator if omitted.
 
-def create_time_series(n, a, ct):
+def create_time_series(n, a, ct, rng = None):
+    
+    #Use global generator if no random stream is provided
+    if rng is None:
+        rng = np.random
     
     #Create an empty vector to hold values
     time_series = np.empty((0,))
     
     #Compute first point (no autocorrelation possible)
-    point1 = np.random.normal(size = 1)
+    point1 = rng.normal(size = 1)
 
     #Add point1 to time series
     time_series = np.hstack((time_series, point1))
@@ -29,7 +39,7 @@ def create_time_series(n, a, ct):
     for i in range(1, n):
         
         #Compute autocorrelated point
-        point = a*time_series[i-1]+np.random.normal(size = 1)
+        point = a*time_series[i-1]+rng.normal(size = 1)
         
         #Add autocorrelated point to time series
         time_series = np.hstack((time_series, point))
@@ -44,10 +54,10 @@ def create_time_series(n, a, ct):
 #autocorrelation of a, a trend of tr (in degrees), a constant of ct, a minimum 
 #of nb_pointsA in Phase A, a mininum of nb_pointsB in Phase B, stagger each 
 #tiers by stagger_points, nb_tiers number of tiers, and a standardized 
-#mean difference of smd
+#mean difference of smd. The random values are drawn from rng (optional).
 
 def create_MB_data(a, tr, ct, nb_pointsA, nb_pointsB, stagger_points, 
-                     nb_tiers, smd):
+                     nb_tiers, smd, rng = None):
     
     #Create empty labels and values vectors
     labels = np.empty((0,))
@@ -60,7 +70,7 @@ def create_MB_data(a, tr, ct, nb_pointsA, nb_pointsB, stagger_points,
     for tier in range(nb_tiers):
         
         #Create time series
-        time_series = create_time_series(total_points, a, ct)
+        time_series = create_time_series(total_points, a, ct, rng)
         
         #Number of points per phase for tier
         nb_pointsA_tier = nb_pointsA + (tier)*stagger_points
@@ -76,17 +86,8 @@ def create_MB_data(a, tr, ct, nb_pointsA, nb_pointsB, stagger_points,
         #Combine all values in a single vector for tier
         tier_values = np.hstack((PhaseA, PhaseB))
     
-        #Identify middle point around which to pivot trend
-        middle_point = np.median(range(len(tier_values)))
-        
-        #Apply trend to all points
-        for i in range(len(tier_values)):
-            
-            #Compute distance to middle point for each point
-            distance = i - middle_point
-            
-            #Add trend to each point using trigonometry (tangent of radians)
-            tier_values[i] = tier_values[i] + distance*math.tan(tr*math.pi/180)
+        #Add trend to all points (pivoting around middle point)
+        tier_values += trend_offsets(len(tier_values), tr)
         
     
         #Create labels for tier
@@ -108,6 +109,9 @@ def create_MB_data(a, tr, ct, nb_pointsA, nb_pointsB, stagger_points,
 #Function to produce multiple baseline graph
 
 def MBgraph(MB_data):
+    
+    #Convert labels to strings (if stored as codes)
+    MB_data = [phase_labels(MB_data[0]), MB_data[1]]
 
     #Extract number of tiers from MB_data 
     nb_tiers = int((MB_data[0][len(MB_data[0])-1])[1])
@@ -12,16 +12,23 @@ from matplotlib.backends.backend_pdf import PdfPages
 import pandas as pd
 
 #Import functions
-from functions_commented import create_time_series, create_AB_data, add_trend,\
-    ABgraph, CDC_method
+from functions_commented import ABgraph, CDC_method
+from streams import regenerate_series
+from precision import save_series
+from expert_analysis import simulation_table, legacy_ratings, \
+    analyze_ratings, agreement
 
-#Set values for each characteristic of data series
-nb_pointsA_list = [3,5]
-nb_pointsB_list = [5,10]
-a_list = [0, 0.2, 0.4]
-tr_list = [0, 15, 30]
-smd_list = [0,0,0,1,2,3]
-ct = 10
+#Import values for each characteristic of data series and list of cells 
+#(i.e., all combinations of the values)
+from grids import tr_list, AB_cells
+
+#Root seed of the simulation (any graph can be regenerated from the seed, its 
+#cell, and its replicate using regenerate_series in streams.py)
+seed = 48151
+
+#Precision of the data series ('float64' or 'float32' to halve memory use; 
+#see precision_check.py for the effect on the CDC method)
+precision = 'float64'
 
 #Empty list to contain all the input data
 all_AB_data = []
@@ -32,35 +39,28 @@ true_values = np.empty((0,))
 #Empty vector to contain trend values for each data series
 trend_values = np.empty((0,))
 
-#Loop for each variable
-for nb_pointsA in nb_pointsA_list:
-    for nb_pointsB in nb_pointsB_list:
-        for a in a_list:
-            for tr in tr_list: 
-                for smd in smd_list: 
-                    
-                    #Create time series
-                    time_series = create_time_series(nb_pointsA+nb_pointsB, a,
-                                                     ct)
-                    
-                    #Divide series in Phases A and B and add smd to Phase B
-                    AB_data = create_AB_data(time_series, nb_pointsA, 
-                                             nb_pointsB, smd)
+#Loop for each cell (combination of values)
+for cell, (nb_pointsA, nb_pointsB, a, tr, smd) in enumerate(AB_cells):
                     
-                    #Add trend (optional)
-                    AB_data = add_trend(AB_data, tr)
-                    
-                    #Add data series to list
-                    all_AB_data.append(AB_data)
-                    
-                    #Add true value to vector
-                    if smd == 0:
-                        true_values = np.hstack((true_values,0))
-                    if smd > 0:
-                        true_values = np.hstack((true_values,1))
-                    
-                    #Add trend value to vector
-                    trend_values = np.hstack((trend_values, tr))
+    #Create data series (first replicate of cell) from its random stream: 
+    #time series with autocorrelation, smd added to Phase B and trend, 
+    #converted to precision mode
+    AB_data = regenerate_series(seed, 'AB', cell, 0, precision)
+    
+    #Add data series to list
+    all_AB_data.append(AB_data)
+    
+    #Add true value to vector
+    if smd == 0:
+        true_values = np.hstack((true_values,0))
+    if smd > 0:
+        true_values = np.hstack((true_values,1))
+    
+    #Add trend value to vector
+    trend_values = np.hstack((trend_values, tr))
+
+#Save data series
+save_series('AB_series.npz', all_AB_data, precision)
 
 #Create AB graphs
 
@@ -79,16 +79,19 @@ for i in range(len(all_AB_data)):
 #Close pdf
 pp.close()
 
-#Apply CDC to all graphs 
+#Apply CDC to all graphs (to compute Type I error rates and power for each 
+#cell over many replicates, see run_AB_grid in executors.py, which can run 
+#in parallel or on several machines)
 
-#Create list to hold results
-cdc_results = []
+#Create vector to hold results (1 = effect, 0 = no effect)
+cdc_results = np.empty((0,), dtype = np.uint8)
 
 #For each data series
 for i in range(len(all_AB_data)):
     
     #Apply CDC and append result to vector
-    cdc_results = np.hstack((cdc_results, CDC_method(all_AB_data[i])))
+    cdc_results = np.hstack((cdc_results, 
+                             np.uint8(CDC_method(all_AB_data[i]))))
 
 #Check validity of CDC method
 #Overall accuracy
@@ -104,17 +107,25 @@ power_CDC = np.sum(cdc_results[idx_1])/len(idx_1)
 
 #Check validity of visual inspeciton 
 
-#Import expert data
-expert_data = (pd.read_csv('Expert_data.csv', header = None)).values.flatten()
-
-#Overall accuracy
-accuracy_VI = np.sum(expert_data == true_values)/len(true_values)
-
-#Type I error rate 
-typeI_error_VI = np.sum(expert_data[idx_0])/len(idx_0)
-
-#Power 
-power_VI = np.sum(expert_data[idx_1])/len(idx_1)
+#Table of simulated series with their true values and CDC results
+simulation = simulation_table('AB', 1, cdc_results)
+
+#Import expert data (rows in the order of generation) and count ratings for 
+#each rater and cell. Rating files with columns series_id, rater and rating 
+#can be streamed with read_ratings('ratings.csv') instead.
+counts, nb_unmatched = analyze_ratings(legacy_ratings('Expert_data.csv', 
+                                                      'AB'), simulation)
+
+#Overall accuracy, Type I error rate and power
+results_VI = agreement(counts)
+accuracy_VI = results_VI['accuracy'][0]
+typeI_error_VI = results_VI['typeI_error'][0]
+power_VI = results_VI['power'][0]
+
+#Accuracy, Type I error rate, power and kappa against CDC for each rater 
+#and for each cell
+results_VI_by_rater = agreement(counts, 'rater')
+results_VI_by_cell = agreement(counts, ['design', 'cell'])
 
 #Examine Type I error based on trend for CDC method
 
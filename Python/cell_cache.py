@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+#Conducting Monte Carlo Simulations to Generate and Analyze Single-Case Graphs
+
+#Import packages
+from functools import lru_cache
+import numpy as np
+import math
+
+#Maximum number of design shapes kept by each cache (least recently used
+#shapes are removed first)
+cache_size = 1024
+
+#List of cutoff values from Fisher et al. (2003)
+Fisheretal=[np.nan,np.nan,3,4,5,6,6,7,8,8,9,9,10,11,12,12,12,13,13,13,14,14,15]
+
+#Values returned by the functions below are shared by all data series with
+#the same shape and are therefore read-only
+
+def read_only(array):
+    array.setflags(write = False)
+    return(array)
+
+#This function computes the values added to a series of n points to apply a
+#trend of tr degrees pivoting around its middle point
+
+@lru_cache(maxsize = cache_size)
+def trend_offsets(n, tr):
+
+    #Distance of each point to the middle point
+    distance = np.arange(n) - np.median(range(n))
+
+    #Return trend of each point using trigonometry (tangent of radians)
+    return(read_only(distance*math.tan(tr*math.pi/180)))
+
+#This function computes the values needed by the CDC method for a Phase A of
+#nb_pointsA points and a Phase B of nb_pointsB points: the matrix projecting
+#the values of Phase A on the trend line of Phase B (ordinary least squares)
+#and the cutoff value for Phase B. The projection matrix is computed in 
+#float64 and stored in dtype (e.g., 'float32' for float32 values).
+
+@lru_cache(maxsize = cache_size)
+def CDC_cell(nb_pointsA, nb_pointsB, dtype = 'float64'):
+
+    #Design matrix of Phase A (intercept and measurement times)
+    XA = np.column_stack((np.ones(nb_pointsA), np.arange(nb_pointsA)))
+
+    #Hat matrix of the regression (coefficients = hat matrix x values)
+    hat = np.linalg.pinv(XA)
+
+    #Design matrix of Phase B (trend line continues after Phase A)
+    XB = np.column_stack((np.ones(nb_pointsB),
+                          np.arange(nb_pointsA, nb_pointsA+nb_pointsB)))
+
+    #Projection of the values of Phase A on the trend line of Phase B
+    projection = read_only((XB @ hat).astype(dtype))
+
+    #Cutoff value for Phase B
+    cutoff = Fisheretal[nb_pointsB-1]
+
+    #Return projection matrix and cutoff
+    return(projection, cutoff)
+
+#This function computes the layout of an AB graph with nb_pointsA and
+#nb_pointsB points: x values of each phase, position of the phase change line
+#and positions of the phase labels
+
+@lru_cache(maxsize = cache_size)
+def AB_layout(nb_pointsA, nb_pointsB):
+
+    #x values of Phases A and B
+    xA = read_only(np.arange(1, nb_pointsA+1))
+    xB = read_only(np.arange(nb_pointsA+1, nb_pointsA+nb_pointsB+1))
+
+    #Position of phase change line
+    phase_line = nb_pointsA+0.5
+
+    #Positions of phase labels
+    label_positions = ((nb_pointsA+1)/2, (nb_pointsA*2+nb_pointsB+1)/2)
+
+    #Return layout
+    return(xA, xB, phase_line, label_positions)
+
+#This function computes the layout of an ABAB graph with nb_pointsA1,
+#nb_pointsB1, nb_pointsA2 and nb_pointsB2 points: x values of each phase,
+#positions of the phase change lines and positions of the phase labels
+
+@lru_cache(maxsize = cache_size)
+def ABAB_layout(nb_pointsA1, nb_pointsB1, nb_pointsA2, nb_pointsB2):
+
+    #Last point of each phase
+    ends = np.cumsum([nb_pointsA1, nb_pointsB1, nb_pointsA2, nb_pointsB2])
+    starts = ends - [nb_pointsA1, nb_pointsB1, nb_pointsA2, nb_pointsB2]
+
+    #x values of each phase
+    x_values = tuple(read_only(np.arange(start+1, end+1)) for start, end
+                     in zip(starts, ends))
+
+    #Positions of phase change lines
+    phase_lines = tuple(float(end)+0.5 for end in ends[:3])
+
+    #Positions of phase labels (middle of each phase)
+    label_positions = tuple((float(start)+float(end)+1)/2 for start, end
+                            in zip(starts, ends))
+
+    #Return layout
+    return(x_values, phase_lines, label_positions)
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+#Conducting Monte Carlo Simulations to Generate and Analyze Single-Case Graphs
+
+#Import packages
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+
+#Import functions
+from functions_commented import CDC_method
+from grids import AB_cells, cell_columns
+from streams import regenerate_series
+
+#A shard is a tuple (seed, cell, start, stop, precision) covering the 
+#replicates start to stop - 1 of one cell in a precision mode of 
+#precision.py. Running a shard returns a tuple (cell, counts)
+#where counts is an array holding the number of series and the number of
+#series for which the CDC method detected an effect. Counts of shards are
+#added to merge them, so they can be merged in any order.
+
+#This function divides nb_replicates replicates of each of nb_cells cells
+#into shards of at most shard_size replicates
+
+def make_shards(seed, nb_cells, nb_replicates, shard_size,
+                precision = 'float64'):
+
+    #Return list of shards
+    return([(seed, cell, start, min(start+shard_size, nb_replicates),
+             precision)
+            for cell in range(nb_cells)
+            for start in range(0, nb_replicates, shard_size)])
+
+#This function generates the AB series of a shard and applies the CDC method
+#to each of them
+
+def run_AB_shard(shard):
+
+    #Extract shard
+    seed, cell, start, stop, precision = shard
+
+    #Count series with an effect detected by the CDC method
+    positives = 0
+    for replicate in range(start, stop):
+
+        #Create data series from its random stream
+        AB_data = regenerate_series(seed, 'AB', cell, replicate, precision)
+
+        #Apply CDC
+        positives += CDC_method(AB_data)
+
+    #Return cell and counts
+    return(cell, np.array([stop - start, positives], dtype = np.int64))
+
+#Executor running shards one after the other in the current process
+
+class SerialExecutor:
+
+    #Run function on each shard and yield results
+    def run(self, function, shards):
+        for shard in shards:
+            yield(function(shard))
+
+    #Nothing to release
+    def close(self):
+        pass
+
+#Executor running shards in n_jobs processes of the current machine
+
+class ProcessExecutor:
+
+    #Start process pool
+    def __init__(self, n_jobs = None):
+        self.pool = ProcessPoolExecutor(n_jobs)
+
+    #Run function on each shard and yield results as they are completed
+    def run(self, function, shards):
+        futures = [self.pool.submit(function, shard) for shard in shards]
+        for future in as_completed(futures):
+            yield(future.result())
+
+    #Stop process pool
+    def close(self):
+        self.pool.shutdown()
+
+#Executor running shards on a Dask cluster (requires dask.distributed). If
+#address is None, a local cluster with n_workers workers is started;
+#otherwise, the executor connects to the scheduler at address, whose
+#workers may be on several machines (each worker needs this folder on its
+#path).
+
+class DaskExecutor:
+
+    #Connect to cluster
+    def __init__(self, address = None, n_workers = None):
+        try:
+            from dask.distributed import Client, LocalCluster
+        except ImportError:
+            raise ImportError('DaskExecutor requires dask.distributed')
+        if address is None:
+            self.cluster = LocalCluster(n_workers = n_workers)
+            self.client = Client(self.cluster)
+        else:
+            self.cluster = None
+            self.client = Client(address)
+
+    #Run function on each shard and yield results as they are completed
+    def run(self, function, shards):
+        from dask.distributed import as_completed as dask_as_completed
+        futures = self.client.map(function, shards, pure = False)
+        for future in dask_as_completed(futures):
+            yield(future.result())
+            future.release()
+
+    #Disconnect from cluster
+    def close(self):
+        self.client.close()
+        if self.cluster is not None:
+            self.cluster.close()
+
+#This function applies the CDC method to nb_replicates AB series of each
+#cell using executor, with shards of shard_size replicates, in a precision
+#mode of precision.py, and returns the proportion of series with a detected
+#effect for each cell (Type I error rate if smd = 0, power otherwise)
+
+def run_AB_grid(executor, seed, nb_replicates, shard_size = 1000,
+                precision = 'float64'):
+
+    #Create shards
+    shards = make_shards(seed, len(AB_cells), nb_replicates, shard_size,
+                         precision)
+
+    #Add counts of shards as they are completed
+    counts = np.zeros((len(AB_cells), 2), dtype = np.int64)
+    for cell, shard_counts in executor.run(run_AB_shard, shards):
+        counts[cell] += shard_counts
+
+    #Create results data frame
+    results = pd.DataFrame(AB_cells, columns = cell_columns['AB'])
+    results['n'] = counts[:, 0]
+    results['cdc_positive'] = counts[:, 1]
+    results['cdc_rate'] = counts[:, 1]/counts[:, 0]
+
+    #Return results
+    return(results)
+
+#To test functions, remove the hashtags from the lines below
+#executor = ProcessExecutor(4)
+#results = run_AB_grid(executor, 48151, 1000, shard_size = 250)
+#executor.close()
@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+#Conducting Monte Carlo Simulations to Generate and Analyze Single-Case Graphs
+
+#Import packages
+from concurrent.futures import ProcessPoolExecutor
+import warnings
+import numpy as np
+import pandas as pd
+
+#Import cells for each design and series ids
+from grids import cells, cell_columns
+from streams import series_id
+
+#Columns of the rating files (one row per judgment)
+rating_columns = ['series_id', 'rater', 'rating']
+
+#Count columns summed for each group of ratings
+count_columns = ['n', 'correct', 'n_null', 'false_positive', 'n_effect',
+                 'true_positive', 'n_cdc', 'vi1_cdc1', 'vi1_cdc0', 'vi0_cdc1',
+                 'vi0_cdc0']
+
+#Finest grouping of the counts (coarser groupings are sums of these counts)
+group_columns = ['rater', 'design', 'cell']
+
+#This function creates the table of simulated series with nb_replicates
+#replicates of each cell of a design. The table contains the parameters of
+#each series, its true value (1 if smd > 0) and, if provided, the result of
+#the CDC method (cdc_results ordered by cell, then by replicate).
+
+def simulation_table(design, nb_replicates = 1, cdc_results = None):
+
+    #Parameters of each cell
+    parameters = pd.DataFrame(cells[design], columns = cell_columns[design])
+    parameters['design'] = design
+    parameters['cell'] = np.arange(len(parameters))
+
+    #Repeat each cell for all replicates
+    simulation = parameters.loc[parameters.index.repeat(nb_replicates)]
+    simulation = simulation.reset_index(drop = True)
+    simulation['replicate'] = np.tile(np.arange(nb_replicates),
+                                      len(parameters))
+
+    #Add series ids
+    simulation['series_id'] = [series_id(design, cell, replicate) for cell,
+        replicate in zip(simulation['cell'], simulation['replicate'])]
+
+    #Add true values
+    simulation['true_value'] = (simulation['smd'] > 0).astype(np.uint8)
+
+    #Add results of CDC method (missing if not provided)
+    if cdc_results is None:
+        simulation['cdc'] = np.nan
+    else:
+        simulation['cdc'] = np.asarray(cdc_results, dtype = float)
+
+    #Return table indexed by series id
+    return(simulation.set_index('series_id'))
+
+#This function reads a rating file (CSV or Parquet with columns series_id,
+#rater and rating) in chunks of chunksize rows without loading the whole file
+
+def read_ratings(path, chunksize = 1000000):
+
+    #Parquet file (requires pyarrow)
+    if str(path).endswith('.parquet'):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError('Reading Parquet files requires pyarrow')
+        for batch in pq.ParquetFile(path).iter_batches(
+                batch_size = chunksize, columns = rating_columns):
+            yield(batch.to_pandas())
+
+    #CSV file
+    else:
+        for chunk in pd.read_csv(path, usecols = rating_columns,
+                                 chunksize = chunksize,
+                                 dtype = {'series_id': str, 'rater': str,
+                                          'rating': np.uint8}):
+            yield(chunk)
+
+#This function reads a rating file in the original format (one rating per
+#row, no header, rows in the order of generation) for a single rater and
+#returns it as a chunk with series ids
+
+def legacy_ratings(path, design = 'AB', rater = 'expert', nb_replicates = 1):
+
+    #Import expert data
+    ratings = (pd.read_csv(path, header = None)).values.flatten()
+
+    #Series ids in the order of generation (cell, then replicate)
+    sids = [series_id(design, i // nb_replicates, i % nb_replicates)
+            for i in range(len(ratings))]
+
+    #Return chunk
+    yield(pd.DataFrame({'series_id': sids, 'rater': rater,
+                        'rating': ratings.astype(np.uint8)}))
+
+#This function joins a chunk of ratings to the simulation table and counts,
+#for each rater and cell, the correct ratings, the false positives, the true
+#positives and the agreement with the CDC method. It returns these counts
+#and the number of ratings whose series id is not in the simulation table.
+
+def summarize_chunk(chunk, simulation):
+
+    #Join ratings to simulated series (unknown series are dropped)
+    joined = chunk.join(simulation[['design', 'cell', 'true_value', 'cdc']],
+                        on = 'series_id', how = 'inner')
+    nb_unmatched = len(chunk) - len(joined)
+
+    #Extract values
+    rating = joined['rating'].to_numpy()
+    true_value = joined['true_value'].to_numpy()
+    cdc = joined['cdc'].to_numpy()
+    has_cdc = ~np.isnan(cdc)
+
+    #Compute indicators for each rating
+    counts = pd.DataFrame({
+        'rater': joined['rater'].to_numpy(),
+        'design': joined['design'].to_numpy(),
+        'cell': joined['cell'].to_numpy(),
+        'n': 1,
+        'correct': rating == true_value,
+        'n_null': true_value == 0,
+        'false_positive': (true_value == 0) & (rating == 1),
+        'n_effect': true_value == 1,
+        'true_positive': (true_value == 1) & (rating == 1),
+        'n_cdc': has_cdc,
+        'vi1_cdc1': has_cdc & (rating == 1) & (cdc == 1),
+        'vi1_cdc0': has_cdc & (rating == 1) & (cdc == 0),
+        'vi0_cdc1': has_cdc & (rating == 0) & (cdc == 1),
+        'vi0_cdc0': has_cdc & (rating == 0) & (cdc == 0)})
+
+    #Return counts for each rater and cell and number of unmatched ratings
+    return(counts.groupby(group_columns)[count_columns].sum(), nb_unmatched)
+
+#Simulation table used by the worker processes
+worker_simulation = None
+
+#This function stores the simulation table once in each worker process
+
+def set_worker_simulation(simulation):
+    global worker_simulation
+    worker_simulation = simulation
+
+#This function summarizes a chunk with the simulation table of the worker
+
+def summarize_worker_chunk(chunk):
+    return(summarize_chunk(chunk, worker_simulation))
+
+#This function counts the ratings of all chunks for each rater and cell.
+#Chunks are summarized in n_jobs processes (a single process if n_jobs = 1)
+#and the counts are added as the results come in, so that only a few chunks
+#are held in memory at a time. It returns the counts and the number of 
+#ratings whose series id is not in the simulation table (with a warning if 
+#there are any).
+
+def analyze_ratings(chunks, simulation, n_jobs = 1):
+
+    #Empty list to contain the counts and unmatched ratings of each chunk
+    all_counts = []
+
+    #Summarize chunks in the current process
+    if n_jobs == 1:
+        for chunk in chunks:
+            all_counts.append(summarize_chunk(chunk, simulation))
+
+    #Summarize chunks in parallel
+    else:
+        with ProcessPoolExecutor(n_jobs, initializer = set_worker_simulation,
+                                 initargs = (simulation,)) as executor:
+
+            #Keep at most two chunks per process waiting
+            pending = []
+            for chunk in chunks:
+                pending.append(executor.submit(summarize_worker_chunk, chunk))
+                if len(pending) >= 2*n_jobs:
+                    all_counts.append(pending.pop(0).result())
+
+            #Collect remaining chunks
+            for future in pending:
+                all_counts.append(future.result())
+
+    #Report ratings of unknown series
+    nb_unmatched = sum(result[1] for result in all_counts)
+    if nb_unmatched > 0:
+        warnings.warn(str(nb_unmatched) + ' ratings have a series id that ' +
+                      'is not in the simulation table and were ignored')
+
+    #No ratings
+    all_counts = [result[0] for result in all_counts]
+    if len(all_counts) == 0:
+        index = pd.MultiIndex.from_arrays([[], [], []], names = group_columns)
+        return(pd.DataFrame(0, index = index, columns = count_columns),
+               nb_unmatched)
+
+    #Add counts of all chunks
+    return(pd.concat(all_counts).groupby(level = group_columns).sum(),
+           nb_unmatched)
+
+#This function computes the accuracy, Type I error rate, power, agreement
+#with the CDC method and Cohen's kappa against the CDC method for each group
+#of counts (e.g., by = 'rater' or by = ['design', 'cell']). Use by = None
+#for global values.
+
+def agreement(counts, by = None):
+
+    #Add counts within each group
+    if by is None:
+        totals = counts[count_columns].sum().to_frame().T
+    else:
+        totals = counts.groupby(level = by)[count_columns].sum()
+    totals = totals.astype(float)
+
+    #Create results data frame
+    results = pd.DataFrame(index = totals.index)
+    results['n'] = totals['n']
+
+    #Overall accuracy, Type I error rate and power
+    results['accuracy'] = totals['correct']/totals['n']
+    results['typeI_error'] = totals['false_positive']/totals['n_null']
+    results['power'] = totals['true_positive']/totals['n_effect']
+
+    #Observed agreement with the CDC method
+    n_cdc = totals['n_cdc']
+    observed = (totals['vi1_cdc1'] + totals['vi0_cdc0'])/n_cdc
+    results['agreement_CDC'] = observed
+
+    #Agreement expected by chance
+    expected = ((totals['vi1_cdc1'] + totals['vi1_cdc0'])*
+                (totals['vi1_cdc1'] + totals['vi0_cdc1']) +
+                (totals['vi0_cdc1'] + totals['vi0_cdc0'])*
+                (totals['vi1_cdc0'] + totals['vi0_cdc0']))/n_cdc**2
+
+    #Cohen's kappa (missing if agreement expected by chance is perfect)
+    results['kappa_CDC'] = ((observed - expected)/
+                            (1 - expected).replace(0, np.nan))
+
+    #Return results
+    return(results)
+
+#To test functions, remove the hashtags from the lines below
+#simulation = simulation_table('AB')
+#counts, nb_unmatched = analyze_ratings(read_ratings('ratings.csv'), 
+#                                       simulation, n_jobs = 4)
+#by_rater = agreement(counts, 'rater')
+#by_cell = agreement(counts, ['design', 'cell'])
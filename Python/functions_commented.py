@@ -8,20 +8,29 @@ Created on Wed Aug 11 09:24:12 2021
 
 #Import packages
 import numpy as np
-import math
 import matplotlib.pyplot as plt
-from sklearn.linear_model import LinearRegression
+
+#Import values precomputed for each design shape
+from cell_cache import trend_offsets, CDC_cell, AB_layout
+
+#Import function to find phases in labels stored as strings or codes
+from precision import phase_indices
 
 #This function creates a time series with n points, an autocorrelation of a,
-#and a constant of ct
+#and a constant of ct. The random values are drawn from rng (e.g., a stream 
+#from series_rng in streams.py) or from the global numpy generator if omitted.
 
-def create_time_series(n, a, ct):
+def create_time_series(n, a, ct, rng = None):
+    
+    #Use global generator if no random stream is provided
+    if rng is None:
+        rng = np.random
     
     #Create an empty vector to hold values
     time_series = np.empty((0,))
     
     #Compute first point (no autocorrelation possible)
-    point1 = np.random.normal(size = 1)
+    point1 = rng.normal(size = 1)
 
     #Add point1 to time series
     time_series = np.hstack((time_series, point1))
@@ -30,7 +39,7 @@ def create_time_series(n, a, ct):
     for i in range(1, n):
         
         #Compute autocorrelated point
-        point = a*time_series[i-1]+np.random.normal(size = 1)
+        point = a*time_series[i-1]+rng.normal(size = 1)
         
         #Add autocorrelated point to time series
         time_series = np.hstack((time_series, point))
@@ -68,17 +77,8 @@ def create_AB_data(time_series, nb_pointsA, nb_pointsB, smd):
 
 def add_trend(AB_data, tr):
     
-    #Identify middle point around which to pivot trend
-    middle_point = np.median(range(len(AB_data[1])))
-    
-    #Apply trend to all points
-    for i in range(len(AB_data[1])):
-        
-        #Compute distance to middle point for each point
-        distance = i - middle_point
-        
-        #Add trend to each point using trigonometry (tangent of radians)
-        AB_data[1][i] = AB_data[1][i] + distance*math.tan(tr*math.pi/180)
+    #Add trend to all points (pivoting around middle point)
+    AB_data[1] += trend_offsets(len(AB_data[1]), tr)
     
     #Return trended AB data series
     return (AB_data)
@@ -88,35 +88,38 @@ def add_trend(AB_data, tr):
 def ABgraph(AB_data):
     
     #Identify indices for Phases A and B
-    A, = np.where(AB_data[0] == 'A')
-    B, = np.where(AB_data[0] == 'B')
+    A = phase_indices(AB_data[0], 'A')
+    B = phase_indices(AB_data[0], 'B')
     
     #Extract values for Phase A and B
     valuesA = AB_data[1][A]
     valuesB = AB_data[1][B]   
+    
+    #Layout of graph for number of points in each phase
+    xA, xB, phase_line, label_positions = AB_layout(len(A), len(B))
    
     #Initilizae figure
     fig = plt.figure()
     ax = fig.add_subplot(111)
     
     #Plot data
-    plt.plot(A+1, valuesA, 'k', B+1, valuesB, 'k', marker = 's', 
+    plt.plot(xA, valuesA, 'k', xB, valuesB, 'k', marker = 's', 
              clip_on=False)
     
     #Add phase change line
-    plt.axvline(x=len(A)+0.5, color = 'k', ls='dashed')
+    plt.axvline(x=phase_line, color = 'k', ls='dashed')
     
     #Add labels
     plt.xlabel('Measurement Times')
     plt.ylabel('Behavior')
     
     #Adjust height of graph
-    plt.ylim(0, np.max(AB_data[1]*1.2))
+    height = np.max(AB_data[1])*1.2
+    plt.ylim(0, height)
     
     #Add labels to Phases 
-    plt.text((len(A)+1)/2, np.max(AB_data[1]*1.2), 'Phase A', ha = 'center')
-    plt.text((len(A)*2+len(B)+1)/2, np.max(AB_data[1]*1.2), 'Phase B', 
-             ha = 'center')
+    plt.text(label_positions[0], height, 'Phase A', ha = 'center')
+    plt.text(label_positions[1], height, 'Phase B', ha = 'center')
     
     #Remove labels from y axis 
     labels = [item.get_text() for item in ax.get_yticklabels()]
@@ -127,16 +130,13 @@ def ABgraph(AB_data):
     ax.spines['right'].set_visible(False)
     ax.spines['top'].set_visible(False)
 
-#List of cutoff values from Fisher et al. (2003)
-Fisheretal=[np.nan,np.nan,3,4,5,6,6,7,8,8,9,9,10,11,12,12,12,13,13,13,14,14,15]
-
 #Function apply CDC method
 
 def CDC_method(AB_data):
     
     #Identify indices for Phases A and B
-    A, = np.where(AB_data[0] == 'A')
-    B, = np.where(AB_data[0] == 'B')
+    A = phase_indices(AB_data[0], 'A')
+    B = phase_indices(AB_data[0], 'B')
     
     #Extract values for Phase A and B
     valuesA = AB_data[1][A]
@@ -146,22 +146,20 @@ def CDC_method(AB_data):
     meanLine = np.mean(valuesA)+np.std(valuesA)*0.25
     
     #Trend line 
-    #Organize data
-    y = np.expand_dims(valuesA, axis=1)
-    X = np.array([range(len(A))]).T
-    
-    #Run linear regression on Phase A
-    lm = LinearRegression().fit(X, y)
+    #Projection of linear regression on Phase A and cutoff value (Fisher et 
+    #al., 2003) for number of points in each phase (projection in the same 
+    #precision as the values)
+    projection, cutoff = CDC_cell(len(A), len(B), valuesA.dtype.name)
     
     #Project trend line on Phase B and add .25 standard deviations
-    trendLine = lm.coef_*np.array(range(len(A),(len(A)+len(B))))+lm.intercept_
+    trendLine = projection @ valuesA
     trendLine = np.round(trendLine, 3) + np.std(valuesA)*0.25
     
     #Number of points falling above both lines
     sigPoints = np.sum(np.logical_and(valuesB > meanLine, valuesB > trendLine))
     
     #Return 1 (effect) if equal to or greater than cutoff value
-    if sigPoints >= Fisheretal[len(B)-1] :
+    if sigPoints >= cutoff :
         return 1
     
     #Return 0 (no effect) if lower than cutoff value
@@ -0,0 +1,318 @@
+# -*- coding: utf-8 -*-
+#Conducting Monte Carlo Simulations to Generate and Analyze Single-Case Graphs
+
+#Import packages
+import csv
+import html
+import io
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlparse
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+#Import functions
+from functions_commented import ABgraph
+from ABABdata import ABABgraph
+from MBdata import MBgraph
+from ATdata import ATgraph
+from grids import cells
+from streams import series_id, parse_series_id, regenerate_series
+
+#Function producing the graph of each design
+graph_functions = {'AB': ABgraph, 'ABAB': ABABgraph, 'MB': MBgraph,
+                   'AT': ATgraph}
+
+#Lock preventing two threads from drawing with pyplot at the same time
+render_lock = threading.Lock()
+
+#This function renders the graph of the data series with identifier sid
+#(e.g., 'AB:12:0') generated from a root seed of seed and returns it as PNG
+#bytes
+
+def render_png(seed, sid):
+
+    #Regenerate data series from its random stream
+    design, cell, replicate = parse_series_id(sid)
+    data = regenerate_series(seed, design, cell, replicate)
+
+    #Draw graph and save it to memory
+    with render_lock:
+        graph_functions[design](data)
+        fig = plt.gcf()
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format = 'png')
+        plt.close(fig)
+
+    #Return PNG bytes
+    return(buffer.getvalue())
+
+#This function creates the queue of series ids to rate with nb_replicates
+#replicates of each cell of the designs. If shuffle_seed is provided, the
+#order of the queue is randomized.
+
+def create_queue(designs, nb_replicates = 1, shuffle_seed = None):
+
+    #List all series ids
+    queue = [series_id(design, cell, replicate) for design in designs
+             for cell in range(len(cells[design]))
+             for replicate in range(nb_replicates)]
+
+    #Randomize order (optional)
+    if shuffle_seed is not None:
+        np.random.default_rng(shuffle_seed).shuffle(queue)
+
+    #Return queue
+    return(queue)
+
+#Class to keep the most recently rendered graphs in memory. Each series has
+#a future holding its PNG, so a graph requested while it is being rendered
+#(e.g., by the prefetch thread) is only rendered once.
+
+class GraphCache:
+
+    #Create an empty cache holding at most max_size graphs
+    def __init__(self, seed, max_size = 64):
+        self.seed = seed
+        self.max_size = max_size
+        self.graphs = OrderedDict()
+        self.lock = threading.Lock()
+
+    #Return the PNG of a series, rendering it only if it is not in the cache
+    def get(self, sid):
+
+        #Find graph in cache and mark it as recently used
+        with self.lock:
+            render = sid not in self.graphs
+            if render:
+                self.graphs[sid] = Future()
+            self.graphs.move_to_end(sid)
+            future = self.graphs[sid]
+
+            #Remove the least recently used graphs if full
+            while len(self.graphs) > self.max_size:
+                self.graphs.popitem(last = False)
+
+        #Render graph outside of the lock (other callers wait for it)
+        if render:
+            try:
+                future.set_result(render_png(self.seed, sid))
+            except Exception as error:
+                future.set_exception(error)
+                with self.lock:
+                    if self.graphs.get(sid) is future:
+                        del self.graphs[sid]
+
+        #Return graph
+        return(future.result())
+
+#Class to append ratings to a CSV file (series_id, rater, rating, time).
+#Each rater can rate each series only once.
+
+class RatingStore:
+
+    #Open store and load the series already rated by each rater
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.rated = {}
+
+        #Read existing ratings (if any)
+        try:
+            with open(path, newline = '') as f:
+                rows = csv.reader(f)
+                next(rows, None)
+                for row in rows:
+                    sid, rater = row[:2]
+                    self.rated.setdefault(rater, set()).add(sid)
+
+        #Create file with header otherwise
+        except FileNotFoundError:
+            with open(path, 'w', newline = '') as f:
+                csv.writer(f).writerow(['series_id', 'rater', 'rating',
+                                        'time'])
+
+    #Append a rating (0 = no effect, 1 = effect) for a series by a rater.
+    #Return False without writing if the rater already rated the series.
+    def add(self, sid, rater, rating):
+        with self.lock:
+            if sid in self.rated.get(rater, set()):
+                return(False)
+            with open(self.path, 'a', newline = '') as f:
+                csv.writer(f).writerow([sid, rater, int(rating),
+                                        round(time.time(), 3)])
+            self.rated.setdefault(rater, set()).add(sid)
+            return(True)
+
+    #Return True if the rater already rated the series
+    def has_rated(self, rater, sid):
+        with self.lock:
+            return(sid in self.rated.get(rater, set()))
+
+#Class to find the next series of the queue to show to each rater. A cursor
+#per rater only moves forward, so finding the next series does not scan the
+#series the rater already rated.
+
+class RatingQueue:
+
+    #Create queue of series ids with ratings read from store
+    def __init__(self, queue, store):
+        self.queue = queue
+        self.series = set(queue)
+        self.store = store
+        self.cursors = {}
+        self.lock = threading.Lock()
+
+    #Return True if the series is in the queue
+    def contains(self, sid):
+        return(sid in self.series)
+
+    #Return the position of the next series not rated by rater (None if all
+    #series are rated)
+    def next_position(self, rater):
+        with self.lock:
+            position = self.cursors.get(rater, 0)
+            while (position < len(self.queue) and
+                   self.store.has_rated(rater, self.queue[position])):
+                position += 1
+            self.cursors[rater] = position
+        if position == len(self.queue):
+            return(None)
+        return(position)
+
+#Page shown to raters
+rating_page = '''<html><body style="text-align:center">
+<p>Series {sid}</p><img src="/graph/{sid}.png"><form method="post"
+action="/rating"><input type="hidden" name="series_id" value="{sid}">
+<input type="hidden" name="rater" value="{rater}">
+<button name="rating" value="0">No effect</button>
+<button name="rating" value="1">Effect</button></form></body></html>'''
+
+#Class handling the requests sent to the service
+
+class GraphHandler(BaseHTTPRequestHandler):
+
+    #Service settings (set by serve)
+    cache = None
+    store = None
+    queue = None
+    nb_prefetch = 3
+    prefetcher = None
+
+    #Send a response to the browser
+    def respond(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    #Render the next graphs of the queue in the background
+    def prefetch(self, position):
+        for sid in self.queue.queue[position+1:position+1+self.nb_prefetch]:
+            self.prefetcher.submit(self.cache.get, sid)
+
+    #Handle GET requests
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+
+        #Graph of a series (/graph/AB:12:0.png)
+        if url.path.startswith('/graph/') and url.path.endswith('.png'):
+            sid = url.path[len('/graph/'):-len('.png')]
+            if not self.queue.contains(sid):
+                self.respond(404, 'text/plain', b'Unknown series')
+                return
+            self.respond(200, 'image/png', self.cache.get(sid))
+
+        #Next series for a rater (/next?rater=r1, add &format=json for JSON)
+        elif url.path in ('/', '/next'):
+            rater = query.get('rater', ['anonymous'])[0]
+            position = self.queue.next_position(rater)
+
+            #All series rated
+            if position is None:
+                self.respond(200, 'text/plain', b'All graphs rated')
+                return
+
+            #Start rendering the graphs that follow
+            sid = self.queue.queue[position]
+            self.prefetch(position)
+
+            #Send series id or rating page
+            if query.get('format', [''])[0] == 'json':
+                body = json.dumps({'series_id': sid, 'graph': '/graph/' +
+                                   sid + '.png', 'remaining':
+                                   len(self.queue.queue) - position})
+                self.respond(200, 'application/json', body.encode())
+            else:
+                body = rating_page.format(sid = sid, rater = html.escape(rater))
+                self.respond(200, 'text/html', body.encode())
+
+        #Unknown path
+        else:
+            self.respond(404, 'text/plain', b'Not found')
+
+    #Handle POST requests (ratings)
+    def do_POST(self):
+
+        #Read form values
+        length = int(self.headers.get('Content-Length', 0))
+        form = parse_qs(self.rfile.read(length).decode())
+        try:
+            sid = form['series_id'][0]
+            rater = form['rater'][0]
+            rating = int(form['rating'][0])
+        except (KeyError, ValueError):
+            self.respond(400, 'text/plain', b'Invalid rating')
+            return
+
+        #Only accept ratings of series in the queue by raters with printable
+        #names (no line breaks or other control characters)
+        if (rating not in (0, 1) or not self.queue.contains(sid) or
+                rater == '' or not rater.isprintable()):
+            self.respond(400, 'text/plain', b'Invalid rating')
+            return
+
+        #Append rating to store (a repeated rating, e.g., after a double
+        #click or a resubmitted form, is ignored)
+        self.store.add(sid, rater, rating)
+
+        #Send rater to the next graph
+        self.send_response(303)
+        self.send_header('Location', '/next?rater=' + quote(rater))
+        self.end_headers()
+
+#This function starts the service on host:port for a root seed of seed,
+#showing the series in queue to raters and writing their ratings to
+#ratings_path. The cache keeps cache_size graphs and the nb_prefetch graphs
+#following the current one are rendered in advance.
+
+def serve(seed, queue, ratings_path, host = '127.0.0.1', port = 8000,
+          cache_size = 64, nb_prefetch = 3):
+
+    #Set service
+    GraphHandler.cache = GraphCache(seed, cache_size)
+    GraphHandler.store = RatingStore(ratings_path)
+    GraphHandler.queue = RatingQueue(queue, GraphHandler.store)
+    GraphHandler.nb_prefetch = nb_prefetch
+    GraphHandler.prefetcher = ThreadPoolExecutor(max_workers = 1)
+
+    #Run service until interrupted
+    server = ThreadingHTTPServer((host, port), GraphHandler)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        GraphHandler.prefetcher.shutdown(wait = False)
+
+#To start the service, remove the hashtags from the two lines below and open
+#http://127.0.0.1:8000/next?rater=r1 in a browser
+#queue = create_queue(['AB'], nb_replicates = 1, shuffle_seed = 1)
+#serve(48151, queue, 'ratings.csv')
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+#Conducting Monte Carlo Simulations to Generate and Analyze Single-Case Graphs
+
+#Import packages
+import itertools
+
+#Values for each characteristic of AB data series (same as the Monte Carlo 
+#simulation script)
+nb_pointsA_list = [3,5]
+nb_pointsB_list = [5,10]
+a_list = [0, 0.2, 0.4]
+tr_list = [0, 15, 30]
+smd_list = [0,0,0,1,2,3]
+ct = 10
+
+#Each cell is a tuple of parameters passed to the function creating the data 
+#series of the design (after the time series for AB designs). The position of 
+#a cell in its list is the cell index used to seed its random streams.
+
+#AB cells: (nb_pointsA, nb_pointsB, a, tr, smd)
+AB_cells = list(itertools.product(nb_pointsA_list, nb_pointsB_list, a_list, 
+                                  tr_list, smd_list))
+
+#ABAB cells: (a, tr, ct, nb_pointsA1, nb_pointsB1, nb_pointsA2, nb_pointsB2, 
+#smd)
+ABAB_cells = [(a, tr, ct, nb_pointsA, nb_pointsB, nb_pointsA, nb_pointsB, smd)
+              for nb_pointsA, nb_pointsB, a, tr, smd in AB_cells]
+
+#Multiple baseline cells: (a, tr, ct, nb_pointsA, nb_pointsB, stagger_points, 
+#nb_tiers, smd)
+MB_cells = [(a, tr, ct, nb_pointsA, nb_pointsB, 3, 3, smd)
+            for nb_pointsA, nb_pointsB, a, tr, smd in AB_cells]
+
+#Alternating-treatment cells: (a, tr, ct, nb_points, smd, alternation)
+AT_cells = list(itertools.product(a_list, tr_list, [ct], [5, 10], smd_list,
+                                  ['systematic', 'semi-random', 'random']))
+
+#Cells for each design
+cells = {'AB': AB_cells, 'ABAB': ABAB_cells, 'MB': MB_cells, 'AT': AT_cells}
+
+#Names of the parameters in the cells of each design
+cell_columns = {'AB': ['nb_pointsA', 'nb_pointsB', 'a', 'tr', 'smd'],
+                'ABAB': ['a', 'tr', 'ct', 'nb_pointsA1', 'nb_pointsB1', 
+                         'nb_pointsA2', 'nb_pointsB2', 'smd'],
+                'MB': ['a', 'tr', 'ct', 'nb_pointsA', 'nb_pointsB', 
+                       'stagger_points', 'nb_tiers', 'smd'],
+                'AT': ['a', 'tr', 'ct', 'nb_points', 'smd', 'alternation']}
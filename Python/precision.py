@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+#Conducting Monte Carlo Simulations to Generate and Analyze Single-Case Graphs
+
+#Import packages
+import numpy as np
+
+#Data types of each precision mode: values of the data series and phase 
+#labels (None keeps the labels as strings). Decisions (CDC results and 
+#ratings, 1 = effect and 0 = no effect) are stored as uint8 in all modes.
+precision_modes = {'float64': {'values': np.float64, 'phases': None},
+                   'float32': {'values': np.float32, 'phases': np.int8}}
+
+#Names of phases in the order of their codes ('A' = 0, 'B' = 1, 'A1' = 2,
+#'B1' = 3, and so on for up to 60 tiers or phases)
+phase_names = ['A', 'B'] + [phase + str(i) for i in range(1, 61)
+                            for phase in ['A', 'B']]
+
+#Code of each phase name
+phase_codes = {name: code for code, name in enumerate(phase_names)}
+
+#This function converts phase labels (e.g., 'A', 'B1') to int8 codes
+
+def encode_phases(labels):
+
+    #Return codes
+    return(np.array([phase_codes[label] for label in labels],
+                    dtype = np.int8))
+
+#This function converts int8 codes back to phase labels
+
+def decode_phases(codes):
+
+    #Return labels
+    return(np.array(phase_names)[codes])
+
+#This function returns the indices of the points of a phase (e.g., 'A')
+#whether the labels are strings or int8 codes
+
+def phase_indices(labels, name):
+
+    #Labels stored as codes
+    if labels.dtype.kind in 'iu':
+        indices, = np.where(labels == phase_codes[name])
+
+    #Labels stored as strings
+    else:
+        indices, = np.where(labels == name)
+
+    #Return indices
+    return(indices)
+
+#This function returns the phase labels of a data series as strings
+
+def phase_labels(labels):
+
+    #Decode labels stored as codes
+    if labels.dtype.kind in 'iu':
+        return(decode_phases(labels))
+
+    #Return labels stored as strings
+    return(labels)
+
+#This function converts a data series ([labels, values]) to a precision mode
+#('float64' keeps the series unchanged, 'float32' stores the values as
+#float32 and the labels as int8 codes)
+
+def to_precision(data, precision = 'float64'):
+
+    #Data types of the mode
+    dtypes = precision_modes[precision]
+
+    #Convert labels
+    labels = data[0]
+    if dtypes['phases'] is not None and labels.dtype.kind not in 'iu':
+        labels = encode_phases(labels)
+
+    #Return converted data series
+    return([labels, data[1].astype(dtypes['values'])])
+
+#This function saves a list of data series to a compressed .npz file in a
+#precision mode (all series are stored in three flat arrays: values, phase
+#codes and the position where each series starts)
+
+def save_series(path, all_data, precision = 'float64'):
+
+    #Data types of the mode
+    dtypes = precision_modes[precision]
+
+    #Position where each series starts
+    lengths = [len(data[1]) for data in all_data]
+    starts = np.concatenate(([0], np.cumsum(lengths))).astype(np.int64)
+
+    #Combine values and phase codes of all series
+    values = np.concatenate([data[1] for data in all_data])
+    codes = np.concatenate([data[0] if data[0].dtype.kind in 'iu' else
+                            encode_phases(data[0]) for data in all_data])
+
+    #Save arrays
+    np.savez_compressed(path, values = values.astype(dtypes['values']),
+                        phases = codes.astype(np.int8), starts = starts)
+
+#This function loads the list of data series saved by save_series. Labels
+#are returned as strings unless codes = True.
+
+def load_series(path, codes = False):
+
+    #Load arrays
+    with np.load(path) as arrays:
+        values = arrays['values']
+        phases = arrays['phases']
+        starts = arrays['starts']
+
+    #Convert labels to strings (optional)
+    if not codes:
+        phases = decode_phases(phases)
+
+    #Return list of data series
+    return([[phases[start:stop], values[start:stop]] for start, stop
+            in zip(starts[:-1], starts[1:])])
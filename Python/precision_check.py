@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+#Conducting Monte Carlo Simulations to Generate and Analyze Single-Case Graphs
+
+#Import packages
+import numpy as np
+import pandas as pd
+
+#Import functions
+from functions_commented import CDC_method
+from cell_cache import CDC_cell
+from grids import AB_cells
+from precision import to_precision, phase_indices
+from streams import series_id, generate_series
+
+#This function computes the lines of the CDC method for a data series and
+#returns the values of Phase B, the mean line, the projected trend line
+#before rounding and the trend line
+
+def CDC_lines(AB_data):
+
+    #Extract values for Phase A and B
+    valuesA = AB_data[1][phase_indices(AB_data[0], 'A')]
+    valuesB = AB_data[1][phase_indices(AB_data[0], 'B')]
+
+    #Mean line and trend line (same computations as CDC_method)
+    meanLine = np.mean(valuesA)+np.std(valuesA)*0.25
+    projection, cutoff = CDC_cell(len(valuesA), len(valuesB),
+                                  valuesA.dtype.name)
+    projected = projection @ valuesA
+    trendLine = np.round(projected, 3) + np.std(valuesA)*0.25
+
+    #Return lines
+    return(valuesB, meanLine, projected, trendLine)
+
+#This function applies the CDC method to nb_replicates AB series of each
+#cell in float64 and in float32 and returns the number
+#of series compared and a data frame describing the series with different
+#decisions. The reason of each difference is 'rounding' if the trend line
+#rounded to 3 decimals differs between precisions (np.round(trendLine, 3)
+#boundary), 'threshold' if a point of Phase B is within tolerance of the
+#mean or trend line, and 'other' otherwise. Series are generated in float64
+#and converted to float32, so both precisions use the same random values;
+#the CDC method then runs in the precision of the values.
+
+def precision_equivalence(seed, nb_replicates = 100, tolerance = 1e-4):
+
+    #Empty list to contain differences
+    differences = []
+
+    #Repeat for each series
+    for cell in range(len(AB_cells)):
+        for replicate in range(nb_replicates):
+
+            #Create series in both precisions
+            data64 = generate_series(seed, 'AB', cell, replicate)
+            data32 = to_precision(data64, 'float32')
+
+            #Compare decisions
+            cdc64 = CDC_method(data64)
+            cdc32 = CDC_method(data32)
+            if cdc64 == cdc32:
+                continue
+
+            #Compare lines to find reason of difference
+            valuesB, mean64, projected64, trend64 = CDC_lines(data64)
+            _, mean32, projected32, trend32 = CDC_lines(data32)
+            margin = np.min(np.abs(np.hstack((valuesB - mean64,
+                                              valuesB - trend64))))
+            if np.any(np.round(projected64, 3) != np.round(projected32, 3)):
+                reason = 'rounding'
+            elif margin < tolerance:
+                reason = 'threshold'
+            else:
+                reason = 'other'
+
+            #Add difference to list
+            differences.append([series_id('AB', cell, replicate), cdc64,
+                                cdc32, margin, reason])
+
+    #Return number of series and differences
+    return(len(AB_cells)*nb_replicates, pd.DataFrame(
+        differences, columns = ['series_id', 'cdc_float64', 'cdc_float32',
+                                'margin', 'reason']))
+
+#To test function, remove the hashtags from the two lines below
+#nb_series, differences = precision_equivalence(48151, 100)
+#print(len(differences), 'of', nb_series, differences['reason'].value_counts())
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+#Conducting Monte Carlo Simulations to Generate and Analyze Single-Case Graphs
+
+#Import packages
+import numpy as np
+
+#Import cells for each design
+from grids import cells, ct
+
+#Import functions
+from functions_commented import create_time_series, create_AB_data, add_trend
+from ABABdata import create_ABAB_data
+from MBdata import create_MB_data
+from ATdata import create_AT_data
+from precision import to_precision
+
+#Code identifying each design in the seed of a random stream
+design_codes = {'AB': 0, 'ABAB': 1, 'MB': 2, 'AT': 3}
+
+#This function creates the random number generator for replicate number 
+#replicate of cell number cell of a design using a root seed of seed. The 
+#generator relies on a counter-based bit generator (Philox) keyed by the four 
+#values, so that each data series has its own independent stream that can be 
+#recreated without generating the series that came before it.
+
+def series_rng(seed, design, cell, replicate):
+    
+    #Derive the key of the stream from the root seed and its position
+    seed_sequence = np.random.SeedSequence(seed, spawn_key = (
+        design_codes[design], cell, replicate))
+    
+    #Return the generator for the stream
+    return(np.random.Generator(np.random.Philox(seed_sequence)))
+
+#This function creates an identifier for a data series (e.g., 'AB:12:0')
+
+def series_id(design, cell, replicate):
+    
+    #Return the identifier
+    return(design + ':' + str(cell) + ':' + str(replicate))
+
+#This function extracts the design, cell and replicate from a series id
+
+def parse_series_id(sid):
+    
+    #Split the identifier
+    design, cell, replicate = sid.split(':')
+    
+    #Return the design, cell and replicate
+    return(design, int(cell), int(replicate))
+
+#This function regenerates the data series for replicate number replicate of 
+#cell number cell of a design using a root seed of seed. The series is 
+#returned in a precision mode of precision.py ('float64' or 'float32').
+
+def regenerate_series(seed, design, cell, replicate, precision = 'float64'):
+    
+    #Generate series in float64 and convert it to the precision mode
+    data = generate_series(seed, design, cell, replicate)
+    return(to_precision(data, precision))
+
+#This function generates the data series for replicate number replicate of 
+#cell number cell of a design using a root seed of seed (float64)
+
+def generate_series(seed, design, cell, replicate):
+    
+    #Create the random stream of the data series
+    rng = series_rng(seed, design, cell, replicate)
+    
+    #Extract parameters of the cell
+    parameters = cells[design][cell]
+    
+    #AB design
+    if design == 'AB':
+        
+        #Create data series with the constant of the grid
+        nb_pointsA, nb_pointsB, a, tr, smd = parameters
+        time_series = create_time_series(nb_pointsA+nb_pointsB, a, ct, rng)
+        AB_data = create_AB_data(time_series, nb_pointsA, nb_pointsB, smd)
+        return(add_trend(AB_data, tr))
+    
+    #ABAB design
+    if design == 'ABAB':
+        return(create_ABAB_data(*parameters, rng = rng))
+    
+    #Multiple baseline design
+    if design == 'MB':
+        return(create_MB_data(*parameters, rng = rng))
+    
+    #Alternating-treatment design
+    if design == 'AT':
+        return(create_AT_data(*parameters, rng = rng))
+
+#To test function, remove the hashtags from the two lines below
+#AB_data = regenerate_series(48151, 'AB', 12, 0)
+#print(AB_data)